@@ -51,20 +51,21 @@ def prep_data(file_path):
                          "icu_beds_used_7_day_avg", "inpatient_beds_used_covid_7_day_avg",
                          "staffed_icu_adult_patients_confirmed_covid_7_day_avg"]]
 
-    # Convert Pandas NAs and Nulls to None type
-    data_hhs = data_hhs.where(pd.notna(data_hhs), None)
-    data_hhs = data_hhs.where(pd.notnull(data_hhs), None)
     # Convert -999s to NaN (will convert to None later)
     data_hhs = data_hhs.replace(-999999, np.nan)
-    # Convert lat + long columns
-    data_hhs['geocoded_hospital_address'] = data_hhs['geocoded_hospital_address'].str.slice(start=7, stop=-1)
-    data_hhs[['latitude', 'longitude']] = data_hhs['geocoded_hospital_address'].str.split(' ', expand=True)
-    data_hhs['latitude'] = data_hhs['latitude'].astype(float)
-    data_hhs['longitude'] = data_hhs['longitude'].astype(float)
+    # Convert lat + long columns (WKT points are ordered longitude, latitude)
+    lon_lat = data_hhs['geocoded_hospital_address'].str.extract(
+        r'POINT \((?P<lon>-?\d+\.?\d*) (?P<lat>-?\d+\.?\d*)\)').astype(float)
+    data_hhs['latitude'] = lon_lat['lat']
+    data_hhs['longitude'] = lon_lat['lon']
+    # Store FIPS codes as integer strings to match the text column
+    data_hhs['fips_code'] = data_hhs['fips_code'].astype('Int64').astype('string')
     # Remove duplicate entries of hospitals based on 'hospital_pk' column
     data_hhs = data_hhs.drop_duplicates(subset='hospital_pk')
     # Convert collection week to date object
     data_hhs['collection_week'] = pd.to_datetime(data_hhs['collection_week'], format='%Y-%m-%d')
+    # Convert Pandas NAs and Nulls to None type in a single pass
+    data_hhs = data_hhs.astype(object).mask(data_hhs.isna(), None)
 
     return data_hhs
 
@@ -79,23 +80,31 @@ def insert_location(cur, data_hhs):
     data_hhs: pandas dataframe
         All columns of the dataset containing data to be inserted
     """
-    location_data = data_hhs[["city", "state", "zip", "address", "latitude", "longitude",
-                              "fips_code"]].itertuples(index=False, name=None)
-    # Convert NaNs to None
-    location_data = (
-        (city, state, zip, address, latitude if not np.isnan(latitude) else None,
-         longitude if not np.isnan(longitude) else None, fips_code if not np.isnan(fips_code) else None)
-        for city, state, zip, address, latitude, longitude, fips_code in location_data
-    )
+    location_data = map(tuple, data_hhs[["city", "state", "zip", "address", "latitude", "longitude",
+                                         "fips_code"]].to_numpy(dtype=object))
 
     try:
-        cur.executemany(
+        # Stage rows with COPY, then merge into location in a single statement
+        # Copy column types only, so staged rows do not draw ids from location_id_seq
+        cur.execute(
+            """
+            CREATE TEMP TABLE _loc_stg ON COMMIT DROP AS
+            SELECT city, state, zip_code, address, latitude, longitude, fips_code
+            FROM location
+            WITH NO DATA
+            """
+        )
+        with cur.copy("COPY _loc_stg (city, state, zip_code, address, latitude, longitude, fips_code) "
+                      "FROM STDIN") as copy:
+            for row in location_data:
+                copy.write_row(row)
+        cur.execute(
             """
             INSERT INTO location (city, state, zip_code, address, latitude, longitude, fips_code)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            SELECT DISTINCT city, state, zip_code, address, latitude, longitude, fips_code
+            FROM _loc_stg
             ON CONFLICT (city, state, zip_code, address, latitude, longitude) DO NOTHING
-            """,
-            location_data
+            """
         )
     except psycopg.IntegrityError as e:
         print(f"Integrity error occurred for row {cur.rowcount}: {e}")
@@ -151,18 +160,21 @@ def insert_hospital(cur, data_hhs, location_ids):
     location_ids: list
         Foreign key corresponding to location (id)
     """
-    hospital_data = [(hospital_pk, hospital_name, location_id)
-                     for hospital_pk, hospital_name, location_id
-                     in zip(data_hhs['hospital_pk'], data_hhs['hospital_name'], location_ids)]
+    hospital_data = zip(data_hhs['hospital_pk'], data_hhs['hospital_name'], location_ids)
 
     try:
-        cur.executemany(
+        # Stage rows with COPY, then merge into hospital in a single statement
+        cur.execute("CREATE TEMP TABLE _hosp_stg (LIKE hospital) ON COMMIT DROP")
+        with cur.copy("COPY _hosp_stg (hospital_pk, hospital_name, location_id) FROM STDIN") as copy:
+            for row in hospital_data:
+                copy.write_row(row)
+        cur.execute(
             """
             INSERT INTO hospital (hospital_pk, hospital_name, location_id)
-            VALUES (%s, %s, %s)
+            SELECT DISTINCT ON (hospital_pk) hospital_pk, hospital_name, location_id
+            FROM _hosp_stg
             ON CONFLICT (hospital_pk) DO NOTHING
-            """,
-            hospital_data
+            """
         )
     except psycopg.errors.ForeignKeyViolation as e:
         print(f"ForeignKeyViolation for row {cur.rowcount}: {e}")
@@ -215,45 +227,30 @@ def insert_weekly_report(cur, data_hhs, hospital_ids):
     hospital_ids: list
         Foreign key corresponding to hospital (hospital_pk)
     """
-    weekly_data = [(collection_week, all_adult, all_pediatric, all_icu, adult_occupied,
-                    pediatric_occupied, icu_occupied, covid_total, covid_adult_icu, hospital_id)
-                   for collection_week, all_adult, all_pediatric, all_icu, adult_occupied,
-                   pediatric_occupied, icu_occupied, covid_total, covid_adult_icu, hospital_id
-                   in zip(data_hhs['collection_week'], data_hhs['all_adult_hospital_beds_7_day_avg'],
-                          data_hhs['all_pediatric_inpatient_beds_7_day_avg'],
-                          data_hhs['total_icu_beds_7_day_avg'],
-                          data_hhs['all_adult_hospital_inpatient_bed_occupied_7_day_avg'],
-                          data_hhs['all_pediatric_inpatient_bed_occupied_7_day_avg'],
-                          data_hhs['icu_beds_used_7_day_avg'], data_hhs['inpatient_beds_used_covid_7_day_avg'],
-                          data_hhs['staffed_icu_adult_patients_confirmed_covid_7_day_avg'], hospital_ids)]
-    # Convert NaNs to None
-    weekly_data = (
-            (collection_week, all_adult if not np.isnan(all_adult) else None,
-             all_pediatric if not np.isnan(all_pediatric) else None,
-             all_icu if not np.isnan(all_icu) else None,
-             adult_occupied if not np.isnan(adult_occupied) else None,
-             pediatric_occupied if not np.isnan(pediatric_occupied) else None,
-             icu_occupied if not np.isnan(icu_occupied) else None,
-             covid_total if not np.isnan(covid_total) else None,
-             covid_adult_icu if not np.isnan(covid_adult_icu) else None,
-             hospital_id)
-            for collection_week, all_adult, all_pediatric, all_icu, adult_occupied,
-            pediatric_occupied, icu_occupied, covid_total, covid_adult_icu, hospital_id in weekly_data
-    )
+    weekly_data = data_hhs[["collection_week", "all_adult_hospital_beds_7_day_avg",
+                            "all_pediatric_inpatient_beds_7_day_avg", "total_icu_beds_7_day_avg",
+                            "all_adult_hospital_inpatient_bed_occupied_7_day_avg",
+                            "all_pediatric_inpatient_bed_occupied_7_day_avg", "icu_beds_used_7_day_avg",
+                            "inpatient_beds_used_covid_7_day_avg",
+                            "staffed_icu_adult_patients_confirmed_covid_7_day_avg"]].to_numpy(dtype=object)
+    weekly_data = (row + (hospital_id,) for row, hospital_id in zip(map(tuple, weekly_data), hospital_ids))
 
     try:
-        cur.executemany(
+        with cur.copy(
             """
-            INSERT INTO weekly_report (collection_week, all_adult_hospital_beds_7_day_avg,
+            COPY weekly_report (collection_week, all_adult_hospital_beds_7_day_avg,
             all_pediatric_inpatient_beds_7_day_avg, total_icu_beds_7_day_avg,
             all_adult_hospital_inpatient_bed_occupied_7_day_avg,
             all_pediatric_inpatient_bed_occupied_7_day_avg, icu_beds_used_7_day_avg,
             inpatient_beds_used_covid_7_day_avg, staffed_icu_adult_patients_confirmed_covid_7_day_avg,
             hospital_weekly_id)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """,
-            weekly_data
-        )
+            FROM STDIN WITH (FORMAT BINARY)
+            """
+        ) as copy:
+            copy.set_types(["date", "float8", "float8", "float8", "float8",
+                            "float8", "float8", "float8", "float8", "text"])
+            for row in weekly_data:
+                copy.write_row(row)
     except psycopg.errors.ForeignKeyViolation as e:
         print(f"ForeignKeyViolation for row {cur.rowcount}: {e}")
         raise
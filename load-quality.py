@@ -2,7 +2,8 @@
 Module: load-quality.py
 
 This script processes hospital quality data from a CSV file and loads it into a PostgreSQL database.
-It verifies the existence of hospitals, adds missing location and hospital records, and inserts quality ratings in batches.
+Rows are streamed into a temporary staging table with COPY, then missing location and hospital records
+and the quality ratings are inserted from it with set-based queries.
 
 Usage:
     python load-quality.py <rating_date> <quality-data-file.csv>
@@ -12,6 +13,7 @@ import sys
 import csv
 import psycopg
 from datetime import datetime
+from operator import itemgetter
 import credentials  # Import credentials
 
 # Database connection
@@ -22,7 +24,18 @@ DB_CONFIG = {
     'password': credentials.DB_PASSWORD
 }
 
-BATCH_SIZE = 1000  # Number of rows to process per batch
+PROGRESS_INTERVAL = 1000  # Number of rows between progress messages
+READ_BUFFER_SIZE = 1 << 20  # Read the CSV in 1 MiB chunks
+
+# Lookup tables for the per-row parsers
+QUALITY_RATINGS = {str(rating): rating for rating in range(1, 6)}
+BOOLEAN_VALUES = {'Yes': True, 'No': False, '': False}
+
+# CSV columns used by process_row, in the order they are unpacked
+CSV_COLUMNS = (
+    'Facility ID', 'Facility Name', 'City', 'State', 'ZIP Code',
+    'Hospital overall rating', 'Hospital Ownership', 'Hospital Type', 'Emergency Services'
+)
 
 
 def main():
@@ -53,33 +66,49 @@ def main():
     cur = conn.cursor()
 
     try:
-        with open(csv_file, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            location_batch = []
-            hospital_batch = []
-            quality_batch = []
-
-            for row_count, row in enumerate(reader, start=1):
-                process_row(location_batch, hospital_batch, quality_batch, row, rating_date)
-
-                # Insert batches when reaching the batch size
-                if row_count % BATCH_SIZE == 0:
-                    insert_batches(cur, location_batch, hospital_batch, quality_batch)
-                    print(f"Processed {row_count} rows...")
-                    # Clear batches after insertion
-                    location_batch.clear()
-                    hospital_batch.clear()
-                    quality_batch.clear()
-
-            # Insert remaining records
-            if location_batch or hospital_batch or quality_batch:
-                insert_batches(cur, location_batch, hospital_batch, quality_batch)
+        with open(csv_file, 'r', encoding='utf-8', buffering=READ_BUFFER_SIZE) as f:
+            reader = csv.reader(f)
+            # Look up column positions once instead of building a dict per row
+            header = next(reader, [])
+            missing_columns = [name for name in CSV_COLUMNS if name not in header]
+            if missing_columns:
+                print(f"Missing required columns in {csv_file}: {', '.join(missing_columns)}")
+                sys.exit(1)
+            get_columns = itemgetter(*(header.index(name) for name in CSV_COLUMNS))
+            create_staging_table(cur)
+
+            row_count = 0
+            with cur.copy("""
+                COPY quality_staging (
+                    facility_id, hospital_name, city, state, zip_code,
+                    quality_rating, rating_date, ownership, hospital_type, provides_emergency_services
+                ) FROM STDIN WITH (FORMAT BINARY)
+            """) as copy:
+                copy.set_types(["text", "text", "text", "text", "text",
+                                "int4", "date", "text", "text", "bool"])
+                for row in reader:
+                    # Skip blank lines and pad short rows with None, as csv.DictReader did
+                    if not row:
+                        continue
+                    if len(row) < len(header):
+                        row += [None] * (len(header) - len(row))
+                    copy.write_row(process_row(get_columns(row), rating_date))
+                    row_count += 1
+                    if row_count % PROGRESS_INTERVAL == 0:
+                        print(f"Processed {row_count} rows...")
+            if row_count % PROGRESS_INTERVAL:
                 print(f"Processed {row_count} rows...")
 
+            insert_from_staging(cur)
+
         # Commit transaction
         conn.commit()
         print("\nData loaded successfully.")
 
+        # Refresh in its own transaction so a missing view cannot roll back the load
+        if not refresh_latest_quality(cur):
+            sys.exit(1)
+
     except FileNotFoundError:
         print(f"File not found: {csv_file}")
         sys.exit(1)
@@ -92,67 +121,120 @@ def main():
         print("Database connection closed.")
 
 
-def process_row(location_batch, hospital_batch, quality_batch, row, rating_date):
+def process_row(row, rating_date):
     """
-    Processes a single row of the CSV file and adds it to the appropriate batch.
+    Processes a single row of the CSV file into a record for the staging table.
 
     Args:
-        location_batch (list): Batch for location records.
-        hospital_batch (list): Batch for hospital records.
-        quality_batch (list): Batch for quality ratings.
-        row (dict): A dictionary containing a single row of CSV data.
+        row (tuple): Values of CSV_COLUMNS for a single row of CSV data.
         rating_date (datetime.date): The date of the rating.
-    """
-    facility_id = row['Facility ID']
-    hospital_name = row['Facility Name']
-    city = row['City']
-    state = row['State']
-    zip_code = row['ZIP Code']
-    ownership = row['Hospital Ownership']
-    emergency_services = parse_boolean(row['Emergency Services'])
-    hospital_type = row['Hospital Type']
-    quality_rating = parse_quality_rating(row['Hospital overall rating'])
 
-    # Add to location batch
-    location_batch.append((city, state, zip_code))
+    Returns:
+        tuple: Values in the column order of the staging table COPY.
+    """
+    (facility_id, hospital_name, city, state, zip_code,
+     quality_rating, ownership, hospital_type, emergency_services) = row
+    return (
+        facility_id,
+        hospital_name,
+        city,
+        state,
+        zip_code,
+        parse_quality_rating(quality_rating),
+        rating_date,
+        ownership,
+        hospital_type,
+        parse_boolean(emergency_services)
+    )
+
+
+def create_staging_table(cursor):
+    """
+    Creates the temporary staging table that CSV rows are copied into.
 
-    # Add to hospital batch
-    hospital_batch.append((facility_id, hospital_name, city, state, zip_code))
+    The table is dropped automatically when the transaction commits.
+    """
+    cursor.execute("""
+        CREATE TEMP TABLE quality_staging (
+            facility_id TEXT,
+            hospital_name TEXT,
+            city TEXT,
+            state TEXT,
+            zip_code TEXT,
+            quality_rating INTEGER,
+            rating_date DATE,
+            ownership TEXT,
+            hospital_type TEXT,
+            provides_emergency_services BOOLEAN
+        ) ON COMMIT DROP
+    """)
+
+
+def insert_from_staging(cursor):
+    """
+    Inserts staged records into the location, hospital and hospital_quality tables.
 
-    # Add to quality batch
-    quality_batch.append((
-        facility_id, quality_rating, rating_date, ownership, hospital_type, emergency_services
-    ))
+    The statements run in pipeline mode so they are sent in one round-trip;
+    the server still executes them in order.
+    """
+    with cursor.connection.pipeline():
+        # Only add locations that are not already present
+        cursor.execute("""
+            INSERT INTO location (city, state, zip_code)
+            SELECT DISTINCT s.city, s.state, s.zip_code
+            FROM quality_staging s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM location l
+                WHERE l.city = s.city AND l.state = s.state AND l.zip_code = s.zip_code
+            )
+            ON CONFLICT DO NOTHING
+        """)
+
+        # Link each hospital to the first matching location
+        cursor.execute("""
+            INSERT INTO hospital (hospital_pk, hospital_name, location_id)
+            SELECT DISTINCT ON (s.facility_id) s.facility_id, s.hospital_name, (
+                SELECT id FROM location
+                WHERE city = s.city AND state = s.state AND zip_code = s.zip_code
+                ORDER BY id LIMIT 1
+            )
+            FROM quality_staging s
+            ON CONFLICT DO NOTHING
+        """)
+
+        cursor.execute("""
+            INSERT INTO hospital_quality (
+                facility_id, quality_rating, rating_date, ownership, hospital_type, provides_emergency_services
+            )
+            SELECT facility_id, quality_rating, rating_date, ownership, hospital_type, provides_emergency_services
+            FROM quality_staging
+            ON CONFLICT DO NOTHING
+        """)
+
+
+def refresh_latest_quality(cursor):
+    """
+    Refreshes the latest_quality materialized view read by the weekly report.
 
+    The view is created by migrations/001_latest_quality.sql; this only refreshes it.
 
-def insert_batches(cursor, location_batch, hospital_batch, quality_batch):
-    """
-    Inserts batched records into the database with improved location handling.
+    Returns:
+        bool: True if the view was refreshed, otherwise False.
     """
-    cursor.executemany("""
-        INSERT INTO location (city, state, zip_code)
-        VALUES (%s, %s, %s)
-        ON CONFLICT DO NOTHING
-    """, location_batch)
-
-    # Updated hospital insertion to handle multiple matching locations
-    cursor.executemany("""
-        INSERT INTO hospital (hospital_pk, hospital_name, location_id)
-        VALUES (%s, %s, (
-            SELECT id FROM location 
-            WHERE city = %s AND state = %s AND zip_code = %s 
-            ORDER BY id LIMIT 1
-        ))
-        ON CONFLICT DO NOTHING
-    """, hospital_batch)
-
-    cursor.executemany("""
-        INSERT INTO hospital_quality (
-            facility_id, quality_rating, rating_date, ownership, hospital_type, provides_emergency_services
-        )
-        VALUES (%s, %s, %s, %s, %s, %s)
-        ON CONFLICT DO NOTHING
-    """, quality_batch)
+    try:
+        cursor.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY latest_quality")
+        cursor.connection.commit()
+    except psycopg.errors.UndefinedTable:
+        cursor.connection.rollback()
+        print("The latest_quality view does not exist. "
+              "Run migrations/001_latest_quality.sql, which creates and populates it.")
+        return False
+    except psycopg.Error as e:
+        cursor.connection.rollback()
+        print(f"Error refreshing the latest_quality view: {e}")
+        return False
+    print("Refreshed the latest_quality view.")
+    return True
 
 
 def parse_quality_rating(value):
@@ -165,12 +247,13 @@ def parse_quality_rating(value):
     Returns:
         int or None: Parsed rating if valid, otherwise None.
     """
-    if not value or value.strip() == 'Not Available':
-        return None
-    rating = int(value) if value.isdigit() else None
-    # Ensure rating is between 1 and 5 per the CHECK constraint
-    if rating is not None and (rating < 1 or rating > 5):
-        return None
+    # Only ratings 1-5 satisfy the CHECK constraint; anything else is None
+    rating = QUALITY_RATINGS.get(value)
+    if rating is None and value:
+        # Fall back for padded or zero-prefixed digits such as ' 5' or '05'
+        value = value.strip()
+        if value.isdigit() and 1 <= int(value) <= 5:
+            rating = int(value)
     return rating
 
 
@@ -184,9 +267,11 @@ def parse_boolean(value):
     Returns:
         bool: True if the value is 'yes' (case-insensitive), otherwise False.
     """
-    if not value:
-        return False
-    return value.strip().lower() == 'yes'
+    parsed = BOOLEAN_VALUES.get(value)
+    if parsed is None:
+        # Fall back for unexpected spellings or surrounding whitespace
+        parsed = bool(value) and value.strip().lower() == 'yes'
+    return parsed
 
 
 if __name__ == "__main__":
@@ -0,0 +1,24 @@
+-- Adds the latest_quality materialized view read by weekly-report.py and
+-- refreshed by load-quality.py, for databases created before it existed.
+-- Safe to run more than once:
+--     psql -d <dbname> -f migrations/001_latest_quality.sql
+
+-- Lets the view pick each facility's latest rating without a full sort
+CREATE INDEX IF NOT EXISTS hospital_quality_facility_rating_date_idx
+    ON hospital_quality (facility_id, rating_date DESC);
+
+-- Created empty so the rows are only computed once, by the refresh below
+CREATE MATERIALIZED VIEW IF NOT EXISTS latest_quality AS
+SELECT DISTINCT ON (facility_id)
+    facility_id,
+    quality_rating
+FROM hospital_quality
+ORDER BY facility_id, rating_date DESC
+WITH NO DATA;
+
+-- Required by REFRESH MATERIALIZED VIEW CONCURRENTLY in load-quality.py
+CREATE UNIQUE INDEX IF NOT EXISTS latest_quality_facility_id_idx
+    ON latest_quality (facility_id);
+
+-- A view created WITH NO DATA cannot be refreshed concurrently, so populate it with a plain refresh
+REFRESH MATERIALIZED VIEW latest_quality;
@@ -1,9 +1,10 @@
 import streamlit as st
 import logging
-from datetime import datetime
+from datetime import date
+import matplotlib
+matplotlib.use('Agg')  # Non-interactive rasterizer; figures are only rendered to images
 import matplotlib.pyplot as plt
 import pandas as pd
-import psycopg
 import credentials
 import plotly.express as px
 import json
@@ -11,6 +12,9 @@ import requests
 from datetime import timedelta
 import matplotlib.dates as mdates
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from psycopg.conninfo import make_conninfo
+from psycopg_pool import ConnectionPool
 
 
 # Configure logging
@@ -27,8 +31,39 @@ DB_CONFIG = {
     'password': credentials.DB_PASSWORD
 }
 
+# Date format used for axis ticks and tables
+DATE_FORMAT = '%Y-%m-%d'
 
-def execute_query(query, conn, params=None):
+# Seconds report query results stay cached; data loaded since then shows after a refresh
+REPORT_CACHE_TTL = 3600
+
+# pandas dtypes for PostgreSQL result types, applied once when a result is loaded
+PANDAS_DTYPES = {
+    'numeric': 'float64',
+    'float4': 'float64',
+    'float8': 'float64',
+    'date': 'datetime64[ns]',
+    'timestamp': 'datetime64[ns]'
+}
+
+
+@st.cache_resource
+def get_pool():
+    """
+    Create the database connection pool once and share it across Streamlit reruns.
+
+    Returns:
+        psycopg_pool.ConnectionPool: Pool of autocommit connections to the database.
+    """
+    pool = ConnectionPool(conninfo=make_conninfo(**DB_CONFIG), min_size=4, max_size=8,
+                          kwargs={'autocommit': True}, open=True)
+    # Fail now, rather than on first use, if the database is unreachable;
+    # wait() closes the pool itself before raising PoolTimeout
+    pool.wait()
+    return pool
+
+
+def execute_query(query, conn, params=None, raise_errors=False):
     """
     Execute a SQL query and return the result as a pandas DataFrame.
 
@@ -36,21 +71,82 @@ def execute_query(query, conn, params=None):
         query (str): The SQL query to execute.
         conn (psycopg.Connection): The database connection object.
         params (list, optional): Parameters to pass with the query.
+        raise_errors (bool, optional): Re-raise query errors instead of returning
+            an empty DataFrame.
 
     Returns:
         pd.DataFrame: DataFrame containing the query results.
     """
     try:
-        with conn.cursor() as cur:
-            cur.execute(query, params)
+        with conn.cursor(binary=True) as cur:
+            # Prepare server-side so repeated report queries skip parse/plan
+            cur.execute(query, params, prepare=True)
             colnames = [desc[0] for desc in cur.description]
+            dtypes = {}
+            for desc in cur.description:
+                type_info = cur.adapters.types.get(desc.type_code)
+                if type_info is not None and type_info.name in PANDAS_DTYPES:
+                    dtypes[desc.name] = PANDAS_DTYPES[type_info.name]
             rows = cur.fetchall()
-        return pd.DataFrame(rows, columns=colnames)
+        # Build the frame column by column to skip row-oriented dtype inference
+        columns = zip(*rows) if rows else ([] for _ in colnames)
+        return pd.DataFrame(dict(zip(colnames, columns)), columns=colnames).astype(dtypes)
     except Exception as e:
-        logging.error(f"Error executing query: {e}")
+        logging.error("Error executing query: %s", e)
+        if raise_errors:
+            raise
         return pd.DataFrame()
 
 
+def execute_query_on_pool(query, pool, params=None):
+    """
+    Execute a SQL query on a connection checked out from the pool.
+
+    Errors are raised rather than returned as an empty DataFrame, so callers
+    can tell a failed query from one that found no rows.
+
+    Args:
+        query (str): The SQL query to execute.
+        pool (psycopg_pool.ConnectionPool): The pool to check a connection out from.
+        params (list, optional): Parameters to pass with the query.
+
+    Returns:
+        pd.DataFrame: DataFrame containing the query results.
+    """
+    with pool.connection() as conn:
+        return execute_query(query, conn, params, raise_errors=True)
+
+
+def execute_queries_concurrently(pool, query_params, queries=QUERIES):
+    """
+    Execute report queries concurrently, each on its own pooled connection.
+
+    Args:
+        pool (psycopg_pool.ConnectionPool): The pool to check connections out from.
+        query_params (dict): Mapping of QUERIES keys to the parameters for that query.
+        queries (dict, optional): Mapping of QUERIES keys to the SQL to run for them.
+
+    Returns:
+        tuple: Mapping of QUERIES keys to DataFrames containing the query results,
+            and mapping of QUERIES keys to error messages for the queries that failed.
+            A failed query's DataFrame is empty.
+    """
+    with ThreadPoolExecutor(max_workers=len(query_params)) as executor:
+        futures = {
+            key: executor.submit(execute_query_on_pool, queries[key], pool, params)
+            for key, params in query_params.items()
+        }
+    data_frames = {}
+    errors = {}
+    for key, future in futures.items():
+        try:
+            data_frames[key] = future.result()
+        except Exception as e:
+            data_frames[key] = pd.DataFrame()
+            errors[key] = str(e)
+    return data_frames, errors
+
+
 def plot_beds_utilization_streamlit(df):
     """
     Plot beds utilization by hospital quality rating in Streamlit.
@@ -62,9 +158,6 @@ def plot_beds_utilization_streamlit(df):
         st.warning("No data available for Beds Utilization by Quality Rating.")
         return
 
-    # Ensure the data types are correct
-    df['percent_beds_in_use'] = pd.to_numeric(df['percent_beds_in_use'], errors='coerce')
-
     # Create a boolean mask to filter out rows where 'percent_beds_in_use' is NaN
     valid_data = df[~np.isnan(df['quality_rating'])]
 
@@ -79,8 +172,9 @@ def plot_beds_utilization_streamlit(df):
     ax.set_xlabel("Hospital Quality Rating")
     ax.set_ylabel("Percent of Beds in Use (%)")
 
-    # Render the plot in Streamlit
+    # Render the plot in Streamlit, then release the figure
     st.pyplot(fig)
+    plt.close(fig)
 
 
 def plot_total_beds_used(df):
@@ -88,35 +182,31 @@ def plot_total_beds_used(df):
     Plot total hospital beds used per week, split into all cases and COVID cases.
 
     Args:
-        df (pd.DataFrame): DataFrame with 'collection_week', 'total_beds_used', and 'covid_beds_used'.
+        df (pd.DataFrame): DataFrame with 'collection_week', 'total_beds_used', and 'covid_beds_used',
+            one row per week in chronological order.
     """
     if df.empty:
         st.warning("No data available for Total Beds Used.")
         return
 
-    # Ensure proper data types
-    df['collection_week'] = pd.to_datetime(df['collection_week'])
-    df.sort_values('collection_week', inplace=True)
-
     # Plot
     fig, ax = plt.subplots(figsize=(10, 6))
     ax.plot(df['collection_week'], df['total_beds_used'], label='All Cases', marker='o')
     ax.plot(df['collection_week'], df['covid_beds_used'], label='COVID Cases', marker='o')
 
     # Format the x-ticks to match the selected dates
-    unique_weeks = sorted(df['collection_week'].unique())
-    ax.set_xticks(unique_weeks)  # Use the unique collection weeks as x-ticks
-    ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))  # Format dates as YYYY-MM-DD
+    ax.set_xticks(df['collection_week'])  # SQL already groups and orders by week
+    ax.xaxis.set_major_formatter(mdates.DateFormatter(DATE_FORMAT))  # Format dates as YYYY-MM-DD
     # Formatting
     ax.set_title("Total Hospital Beds Used Per Week")
     ax.set_xlabel("Week")
     ax.set_ylabel("Number of Beds")
-    ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-    plt.xticks(rotation=45)
+    ax.tick_params(axis='x', labelrotation=45)
     ax.legend()
 
-    # Render in Streamlit
+    # Render in Streamlit, then release the figure
     st.pyplot(fig)
+    plt.close(fig)
 
 
 def plot_covid_cases_map(df):
@@ -198,59 +288,47 @@ def plot_hospital_utilization_streamlit(df):
 
     Args:
         df (pd.DataFrame): DataFrame with 'state', 'collection_week',
-            and 'percent_utilization' columns.
+            and 'percent_utilization' columns for the top 10 states,
+            ordered by state rank and then by week.
     """
     if df.empty:
         st.warning("No data available for Hospital Utilization by State plot.")
         return
 
-    # Convert data types
-    df['collection_week'] = pd.to_datetime(df['collection_week'])
     df = df.dropna(subset=['percent_utilization'])
-    df['percent_utilization'] = pd.to_numeric(df['percent_utilization'], errors='coerce')
-
-    # Get the latest date
-    latest_date = df['collection_week'].max()
-    # Find the top 10 states by utilization in the latest week
-    latest_data = df[df['collection_week'] == latest_date]
-    latest_data = latest_data.dropna(subset=['percent_utilization'])
-    latest_data['percent_utilization'] = latest_data['percent_utilization'].astype(float)
-    top_states = latest_data.nlargest(10, 'percent_utilization')['state'].unique()
-    # Filter dataframe to only include top states
-    df_filtered = df[df['state'].isin(top_states)]
-
-    # Set up the figure
-    unique_weeks = sorted(df['collection_week'].unique())
-    # Set the x-ticks to match the available collection weeks
-    fig, ax = plt.subplots(figsize=(14, 6))
-    # Plot each state's data
-    for state in top_states:
-        state_df = df_filtered[df_filtered['state'] == state]
-        plt.plot(
-            state_df['collection_week'],
-            state_df['percent_utilization'],
-            label=f"{state} ({state_df['percent_utilization'].iloc[-1]:.1f}%)"
-        )
+
+    # One column per state, kept in the rank order SQL returned, and one row per week
+    utilization = df.pivot(index='collection_week', columns='state', values='percent_utilization')
+    utilization = utilization[df['state'].unique()]
+    # Label each state with its most recent reported utilization
+    latest_values = utilization.ffill().iloc[-1]
+    labels = [f"{state} ({value:.1f}%)" for state, value in latest_values.items()]
+
+    # Set up the figure; constrained layout makes room for the outside legend
+    fig, ax = plt.subplots(figsize=(14, 6), layout='constrained')
+    # Plot every state's data in a single call
+    lines = ax.plot(utilization.index, utilization.to_numpy())
 
     # Format the x-ticks to match the selected dates
-    ax.set_xticks(unique_weeks)  # Use the unique collection weeks as x-ticks
-    ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))  # Format dates as YYYY-MM-DD
+    ax.set_xticks(utilization.index)  # Use the unique collection weeks as x-ticks
+    ax.xaxis.set_major_formatter(mdates.DateFormatter(DATE_FORMAT))  # Format dates as YYYY-MM-DD
 
     # Adjust x-axis ticks and labels
-    plt.xticks(rotation=45)
-    plt.title(
+    ax.tick_params(axis='x', labelrotation=45)
+    ax.set_title(
         "Hospital Utilization by State Over Time\n"
         "(Top 10 States by Current Utilization)", fontsize=12
     )
-    plt.xlabel("Week", fontsize=10)
-    plt.ylabel("Percent Utilization (%)", fontsize=10)
-    plt.gca().yaxis.set_major_formatter(
+    ax.set_xlabel("Week", fontsize=10)
+    ax.set_ylabel("Percent Utilization (%)", fontsize=10)
+    ax.yaxis.set_major_formatter(
         plt.FuncFormatter(lambda x, _: f'{x:.1f}')
     )
-    plt.legend(loc='center left', bbox_to_anchor=(1.05, 0.5), fontsize='small')
-    plt.tight_layout(rect=[0, 0, 0.85, 1])
+    ax.legend(lines, labels, loc='center left', bbox_to_anchor=(1.05, 0.5), fontsize='small')
 
-    st.pyplot(plt)
+    # Render in Streamlit, then release the figure
+    st.pyplot(fig)
+    plt.close(fig)
 
 
 def add_text_streamlit(title, text):
@@ -271,7 +349,7 @@ QUERIES = {
     WITH weekly_counts AS (
     SELECT
         collection_week,
-        COUNT(DISTINCT hospital_weekly_id) AS hospital_count
+        COUNT(hospital_weekly_id) AS hospital_count  -- UNIQUE(hospital_weekly_id, collection_week)
     FROM weekly_report
     GROUP BY collection_week
     )
@@ -308,25 +386,17 @@ QUERIES = {
     "beds_utilization": """
     SELECT
         hq.quality_rating,
-        ROUND(
+        CAST(ROUND(
             CAST(
                 (SUM(wr.all_adult_hospital_inpatient_bed_occupied_7_day_avg +
                      wr.all_pediatric_inpatient_bed_occupied_7_day_avg) * 100.0 /
                 NULLIF(SUM(wr.all_adult_hospital_beds_7_day_avg + wr.all_pediatric_inpatient_beds_7_day_avg), 0))
                 AS NUMERIC)
             , 1
-        ) AS percent_beds_in_use
-    FROM (
-        SELECT DISTINCT ON (facility_id)
-            facility_id,
-            quality_rating
-        FROM hospital_quality
-        ORDER BY facility_id, rating_date DESC
-    ) hq
+        ) AS FLOAT8) AS percent_beds_in_use
+    FROM latest_quality hq
     JOIN weekly_report wr ON hq.facility_id = wr.hospital_weekly_id
-    WHERE wr.collection_week = (
-        SELECT MAX(collection_week) FROM weekly_report WHERE collection_week <= %s
-    )
+    WHERE wr.collection_week = %s
     GROUP BY hq.quality_rating
     ORDER BY hq.quality_rating;
     """,
@@ -359,9 +429,7 @@ QUERIES = {
     FROM weekly_report wr
     JOIN hospital h ON wr.hospital_weekly_id = h.hospital_pk
     JOIN location loc ON h.location_id = loc.id
-    WHERE wr.collection_week = (
-        SELECT MAX(collection_week) FROM weekly_report WHERE collection_week <= %s
-    )
+    WHERE wr.collection_week = %s
     GROUP BY loc.state
     ORDER BY open_beds ASC
     LIMIT 10;
@@ -376,45 +444,159 @@ QUERIES = {
     JOIN location loc ON h.location_id = loc.id
     LEFT JOIN weekly_report wr ON h.hospital_pk = wr.hospital_weekly_id
     GROUP BY h.hospital_name, loc.city, loc.state
-    HAVING MAX(wr.collection_week) < (
-        SELECT MAX(collection_week) FROM weekly_report WHERE collection_week <= %s
-    )
+    HAVING MAX(wr.collection_week) < %s
     ORDER BY h.hospital_name ASC
     LIMIT 10;
     """,
     "hospital_utilization_by_state_over_time": """
+    WITH latest_utilization AS (
+        SELECT
+            loc.state,
+            SUM(wr.all_adult_hospital_inpatient_bed_occupied_7_day_avg + wr.all_pediatric_inpatient_bed_occupied_7_day_avg) /
+            NULLIF(SUM(wr.all_adult_hospital_beds_7_day_avg + wr.all_pediatric_inpatient_beds_7_day_avg), 0) AS utilization
+        FROM weekly_report wr
+        JOIN hospital h ON wr.hospital_weekly_id = h.hospital_pk
+        JOIN location loc ON h.location_id = loc.id
+        WHERE wr.collection_week = %s
+        GROUP BY loc.state
+    ),
+    top_states AS (
+        SELECT
+            state,
+            ROW_NUMBER() OVER (ORDER BY utilization DESC) AS state_rank
+        FROM latest_utilization
+        WHERE utilization IS NOT NULL
+        ORDER BY utilization DESC
+        LIMIT 10
+    )
     SELECT
         wr.collection_week,
         loc.state,
-        ROUND(
+        CAST(ROUND(
             CAST(
                 SUM(wr.all_adult_hospital_inpatient_bed_occupied_7_day_avg + wr.all_pediatric_inpatient_bed_occupied_7_day_avg) * 100.0 /
                 NULLIF(SUM(wr.all_adult_hospital_beds_7_day_avg + wr.all_pediatric_inpatient_beds_7_day_avg), 0)
                 AS NUMERIC)
             , 1
-        ) AS percent_utilization
+        ) AS FLOAT8) AS percent_utilization
     FROM weekly_report wr
     JOIN hospital h ON wr.hospital_weekly_id = h.hospital_pk
     JOIN location loc ON h.location_id = loc.id
+    JOIN top_states ts ON loc.state = ts.state
     WHERE wr.collection_week <= %s
-    GROUP BY wr.collection_week, loc.state
-    ORDER BY wr.collection_week, loc.state;
+    GROUP BY wr.collection_week, loc.state, ts.state_rank
+    ORDER BY ts.state_rank, wr.collection_week;
     """
 }
 
+# beds_utilization for databases where migrations/001_latest_quality.sql has not run yet
+BEDS_UTILIZATION_FALLBACK_QUERY = """
+SELECT
+    hq.quality_rating,
+    CAST(ROUND(
+        CAST(
+            (SUM(wr.all_adult_hospital_inpatient_bed_occupied_7_day_avg +
+                 wr.all_pediatric_inpatient_bed_occupied_7_day_avg) * 100.0 /
+            NULLIF(SUM(wr.all_adult_hospital_beds_7_day_avg + wr.all_pediatric_inpatient_beds_7_day_avg), 0))
+            AS NUMERIC)
+        , 1
+    ) AS FLOAT8) AS percent_beds_in_use
+FROM (
+    SELECT DISTINCT ON (facility_id) facility_id, quality_rating
+    FROM hospital_quality
+    ORDER BY facility_id, rating_date DESC
+) hq
+JOIN weekly_report wr ON hq.facility_id = wr.hospital_weekly_id
+WHERE wr.collection_week = %s
+GROUP BY hq.quality_rating
+ORDER BY hq.quality_rating;
+"""
+
+# Latest reported week on or before the selected date, shared by several QUERIES,
+# and whether the latest_quality view exists and is populated
+LATEST_WEEK_QUERY = """
+SELECT
+    MAX(collection_week) AS latest_week,
+    COALESCE(
+        (SELECT relispopulated FROM pg_class WHERE oid = to_regclass('latest_quality')),
+        FALSE
+    ) AS has_latest_quality
+FROM weekly_report
+WHERE collection_week <= %s;
+"""
+
+
+@st.cache_data(ttl=REPORT_CACHE_TTL)
+def fetch_report_data(_pool, selected_date):
+    """
+    Run all report queries for a week, caching the results per selected date.
+
+    Streamlit reruns the script on every widget interaction; cached results
+    are returned without touching the database for up to REPORT_CACHE_TTL
+    seconds, or until the cache is cleared from the sidebar. generate_report
+    clears the cache after rendering a result with errors, so failures are
+    retried on the next rerun.
+
+    Args:
+        _pool (psycopg_pool.ConnectionPool): The database connection pool (not hashed).
+        selected_date (datetime.date): The week-ending date for the report.
 
-def generate_report(selected_date, conn):
+    Returns:
+        tuple: Mapping of QUERIES keys to DataFrames containing the query results,
+            and mapping of QUERIES keys to error messages for the queries that failed.
+    """
+    # Bind date objects directly so psycopg sends typed date parameters
+    previous_week = selected_date - timedelta(weeks=1)
+
+    # Resolve the latest reported week once instead of in every query
+    latest_week = None
+    latest_week_error = None
+    queries = QUERIES
+    try:
+        latest_week_df = execute_query_on_pool(LATEST_WEEK_QUERY, _pool, [selected_date])
+        if not latest_week_df.empty and pd.notna(latest_week_df['latest_week'].iloc[0]):
+            latest_week = latest_week_df['latest_week'].iloc[0].date()
+        if latest_week_df.empty or not latest_week_df['has_latest_quality'].iloc[0]:
+            queries = {**QUERIES, "beds_utilization": BEDS_UTILIZATION_FALLBACK_QUERY}
+    except Exception as e:
+        latest_week_error = str(e)
+
+    # The queries are independent, so run them all at once
+    query_params = {
+        "hospital_records_summary": [selected_date, previous_week],
+        "beds_summary": [selected_date],
+        "beds_utilization": [latest_week],
+        "weekly_beds_used": [selected_date],
+        "covid_cases_by_state": None,
+        "states_fewest_open_beds": [latest_week],
+        "hospitals_not_reporting": [latest_week],
+        "hospital_utilization_by_state_over_time": [latest_week, selected_date]
+    }
+    if latest_week_error is None:
+        return execute_queries_concurrently(_pool, query_params, queries)
+
+    # Without the latest week, only the queries that do not filter on it can run
+    skipped = ("beds_utilization", "states_fewest_open_beds",
+               "hospitals_not_reporting", "hospital_utilization_by_state_over_time")
+    data_frames, errors = execute_queries_concurrently(
+        _pool, {key: params for key, params in query_params.items() if key not in skipped}
+    )
+    for key in skipped:
+        data_frames[key] = pd.DataFrame()
+        errors[key] = latest_week_error
+    return data_frames, errors
+
+
+def generate_report(selected_date, pool):
     """
     Generate the COVID-19 weekly report interactively in Streamlit.
 
     Args:
         selected_date (datetime.date): The week-ending date for the report.
-        conn (psycopg.Connection): The database connection object.
+        pool (psycopg_pool.ConnectionPool): The database connection pool.
     """
-    previous_week = selected_date - timedelta(weeks=1)
-    
-    selected_date_str = selected_date.strftime('%Y-%m-%d')
-    previous_week_str = previous_week.strftime('%Y-%m-%d')
+    selected_date_str = selected_date.strftime(DATE_FORMAT)
+    data_frames, errors = fetch_report_data(pool, selected_date)
 
     # Header
     st.header(f"HHS COVID-19 Weekly Report")
@@ -423,65 +605,85 @@ def generate_report(selected_date, conn):
 
     # 1. Hospital Records Summary
     st.markdown("### Hospital Records Summary")
-    hospital_records_df = execute_query(QUERIES["hospital_records_summary"], conn, [selected_date_str, previous_week_str])
-    if not hospital_records_df.empty:
-        hospital_records_df['collection_week'] = pd.to_datetime(hospital_records_df['collection_week']).dt.strftime('%Y-%m-%d')
+    hospital_records_df = data_frames["hospital_records_summary"]
+    if "hospital_records_summary" in errors:
+        st.warning(f"Could not load Hospital Records Summary: {errors['hospital_records_summary']}")
+    elif not hospital_records_df.empty:
+        hospital_records_df['collection_week'] = hospital_records_df['collection_week'].dt.strftime(DATE_FORMAT)
         st.table(hospital_records_df)
     else:
         st.warning("No data available for Hospital Records Summary.")
 
     # 2. Beds Summary
     st.markdown("### Beds Summary (Last 5 Weeks)")
-    beds_summary_df = execute_query(QUERIES["beds_summary"], conn, [selected_date_str])
-    if not beds_summary_df.empty:
+    beds_summary_df = data_frames["beds_summary"]
+    if "beds_summary" in errors:
+        st.warning(f"Could not load Beds Summary: {errors['beds_summary']}")
+    elif not beds_summary_df.empty:
+        beds_summary_df['collection_week'] = beds_summary_df['collection_week'].dt.strftime(DATE_FORMAT)
         st.table(beds_summary_df)
     else:
         st.warning("No data available for Beds Summary.")
 
     # 3. Beds Utilization by Quality Rating
     st.markdown("### Beds Utilization by Quality Rating")
-    beds_utilization_df = execute_query(QUERIES["beds_utilization"], conn, [selected_date_str])
-    if not beds_utilization_df.empty:
+    beds_utilization_df = data_frames["beds_utilization"]
+    if "beds_utilization" in errors:
+        st.warning(f"Could not load Beds Utilization by Quality Rating: {errors['beds_utilization']}")
+    elif not beds_utilization_df.empty:
         plot_beds_utilization_streamlit(beds_utilization_df)
     else:
         st.warning("No data available for Beds Utilization by Quality Rating.")
 
     # 4. COVID Cases by State Map
     st.markdown("### COVID Cases by State")
-    covid_cases_df = execute_query(QUERIES["covid_cases_by_state"], conn)
-    if not covid_cases_df.empty:
+    covid_cases_df = data_frames["covid_cases_by_state"]
+    if "covid_cases_by_state" in errors:
+        st.warning(f"Could not load COVID cases by state: {errors['covid_cases_by_state']}")
+    elif not covid_cases_df.empty:
         plot_covid_cases_map(covid_cases_df)
     else:
         st.warning("No data available for COVID cases by state.")
 
     # 5. Total Beds Used Over Time
     st.markdown("### Total Hospital Beds Used Per Week (All Cases vs COVID Cases)")
-    weekly_beds_df = execute_query(QUERIES["weekly_beds_used"], conn, [selected_date_str])
-    if not weekly_beds_df.empty:
+    weekly_beds_df = data_frames["weekly_beds_used"]
+    if "weekly_beds_used" in errors:
+        st.warning(f"Could not load Total Beds Used: {errors['weekly_beds_used']}")
+    elif not weekly_beds_df.empty:
         plot_total_beds_used(weekly_beds_df)
     else:
         st.warning("No data available for Total Beds Used.")
 
     # Additional Analysis: States with Fewest Open Beds
     st.markdown("### States with Fewest Open Beds")
-    fewest_open_beds_df = execute_query(QUERIES["states_fewest_open_beds"], conn, [selected_date_str])
-    if not fewest_open_beds_df.empty:
+    fewest_open_beds_df = data_frames["states_fewest_open_beds"]
+    if "states_fewest_open_beds" in errors:
+        st.warning(f"Could not load States with Fewest Open Beds: {errors['states_fewest_open_beds']}")
+    elif not fewest_open_beds_df.empty:
         st.table(fewest_open_beds_df)
     else:
         st.warning("No data available for States with Fewest Open Beds.")
 
     # Additional Analysis: Hospitals Not Reporting Data
     st.markdown("### Hospitals Not Reporting Data")
-    hospitals_not_reporting_df = execute_query(QUERIES["hospitals_not_reporting"], conn, [selected_date_str])
-    if not hospitals_not_reporting_df.empty:
+    hospitals_not_reporting_df = data_frames["hospitals_not_reporting"]
+    if "hospitals_not_reporting" in errors:
+        st.warning(f"Could not load Hospitals Not Reporting Data: {errors['hospitals_not_reporting']}")
+    elif not hospitals_not_reporting_df.empty:
+        hospitals_not_reporting_df['last_reported_week'] = (
+            hospitals_not_reporting_df['last_reported_week'].dt.strftime(DATE_FORMAT)
+        )
         st.table(hospitals_not_reporting_df)
     else:
         st.warning("No data available for Hospitals Not Reporting Data.")
 
     # Additional Analysis: Hospital Utilization by State Over Time
     st.markdown("### Hospital Utilization by State Over Time")
-    hospital_utilization_df = execute_query(QUERIES["hospital_utilization_by_state_over_time"], conn, [selected_date_str])
-    if not hospital_utilization_df.empty:
+    hospital_utilization_df = data_frames["hospital_utilization_by_state_over_time"]
+    if "hospital_utilization_by_state_over_time" in errors:
+        st.warning(f"Could not load Hospital Utilization by State Over Time: {errors['hospital_utilization_by_state_over_time']}")
+    elif not hospital_utilization_df.empty:
         plot_hospital_utilization_streamlit(hospital_utilization_df)
     else:
         st.warning("No data available for Hospital Utilization by State Over Time.")
@@ -490,6 +692,10 @@ def generate_report(selected_date, conn):
     st.markdown("### Conclusion")
     st.write("This concludes the weekly report. The data presented aims to inform decision-making and highlight areas requiring attention.")
 
+    # Do not keep a partly failed result cached; failed sections are retried on the next rerun
+    if errors:
+        fetch_report_data.clear()
+
 
 
 def get_available_dates(conn):
@@ -510,7 +716,7 @@ def get_available_dates(conn):
     """
     df = execute_query(query, conn)
     if not df.empty:
-        return df['collection_week'].astype(str).tolist()
+        return df['collection_week'].dt.strftime(DATE_FORMAT).tolist()
     else:
         return []
 
@@ -524,22 +730,27 @@ def main():
 
     # Database Connection
     try:
-        with psycopg.connect(**DB_CONFIG, autocommit=True) as conn:
-            st.sidebar.success("Connected to the database.")
+        pool = get_pool()
+        st.sidebar.success("Connected to the database.")
 
-            # Get available dates
+        # Get available dates
+        with pool.connection() as conn:
             available_dates = get_available_dates(conn)
 
-            if available_dates:
-                # Let the user select a date from the available options
-                selected_date_str = st.sidebar.selectbox("Select Week Ending Date", available_dates)
-                selected_date = datetime.strptime(selected_date_str, '%Y-%m-%d').date()
-                st.sidebar.write(f"Selected date: {selected_date}")
-                
-                # Generate the report for the selected date
-                generate_report(selected_date, conn)
-            else:
-                st.sidebar.error("No available dates found in the database.")
+        if available_dates:
+            # Let the user select a date from the available options
+            selected_date_str = st.sidebar.selectbox("Select Week Ending Date", available_dates)
+            selected_date = date.fromisoformat(selected_date_str)
+            st.sidebar.write(f"Selected date: {selected_date}")
+
+            # Drop cached results so newly loaded data shows up immediately
+            if st.sidebar.button("Refresh data"):
+                fetch_report_data.clear()
+            
+            # Generate the report for the selected date
+            generate_report(selected_date, pool)
+        else:
+            st.sidebar.error("No available dates found in the database.")
     except Exception as e:
         st.sidebar.error(f"Database connection error: {e}")
 